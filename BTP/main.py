@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import argparse
 import json
-from dataclasses import asdict
+from dataclasses import fields
 from pathlib import Path
 from typing import Any
 
@@ -11,6 +11,27 @@ from src.features import VideoFeatureExtractor
 from src.file_utils import find_video_file
 from src.prototype_store import PrototypeStore
 from src.summarizer import VideoSummarizer
+from src.video_processing import MOTION_METHODS
+
+
+def _positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        number = None
+    if number is None or number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value!r}")
+    return number
+
+
+def _non_negative_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        number = None
+    if number is None or number < 0:
+        raise argparse.ArgumentTypeError(f"must be a non-negative integer, got {value!r}")
+    return number
 
 
 def parse_args() -> argparse.Namespace:
@@ -32,6 +53,43 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Optional limit on the number of frames to analyze.",
     )
+    parser.add_argument(
+        "--motion-method",
+        choices=tuple(MOTION_METHODS),
+        default="farneback",
+        help="Motion estimator: dense Farneback flow (default), sparse Lucas-Kanade, or frame differencing.",
+    )
+    parser.add_argument(
+        "--max-width",
+        type=_non_negative_int,
+        default=0,
+        help="Downscale wider frames to this width before analysis (default 0 keeps full resolution).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Threads used for people detection; values above 1 run it in parallel across frames.",
+    )
+    parser.add_argument(
+        "--person-interval",
+        type=_positive_int,
+        default=1,
+        help="Run people detection on every Nth sampled frame and reuse the count in between.",
+    )
+    parser.add_argument(
+        "--opencl",
+        action="store_true",
+        help="Run the per-frame OpenCV work on an OpenCL device when one is available.",
+    )
+    parser.add_argument(
+        "--cuda",
+        action="store_true",
+        help=(
+            "Experimental: run people detection, background subtraction and Farneback flow "
+            "on a CUDA device when available."
+        ),
+    )
     parser.add_argument(
         "--dump-stats",
         type=Path,
@@ -51,27 +109,64 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def serialize(features, frame_stats, classification) -> dict[str, Any]:
-    return {
-        "features": asdict(features),
-        "frame_stats": [asdict(frame) for frame in frame_stats],
-        "classification": {
-            "label": classification.label,
-            "scores": classification.scores,
-            "explanation": classification.explanation,
-        },
-    }
+def _shallow(instance) -> dict[str, Any]:
+    """Flat dataclass to dict without the recursive copy done by dataclasses.asdict."""
+
+    return {field.name: getattr(instance, field.name) for field in fields(instance)}
+
+
+def _nested_json(value: Any) -> str:
+    return json.dumps(value, indent=2).replace("\n", "\n  ")
+
+
+def dump_stats(path: Path, features, frame_stats, classification) -> None:
+    """Write features, per-frame stats and classification as one JSON document.
+
+    Frames are written one per line as they are iterated, so the report is never
+    held in memory as a whole.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w") as handle:
+        handle.write('{\n  "features": ')
+        handle.write(_nested_json(_shallow(features)))
+        handle.write(',\n  "frame_stats": [')
+        separator = "\n    "
+        for record in frame_stats.as_records():
+            handle.write(separator)
+            handle.write(json.dumps(record))
+            separator = ",\n    "
+        handle.write('\n  ],\n  "classification": ')
+        handle.write(
+            _nested_json(
+                {
+                    "label": classification.label,
+                    "scores": classification.scores,
+                    "explanation": classification.explanation,
+                }
+            )
+        )
+        handle.write("\n}\n")
 
 
 def main() -> None:
     args = parse_args()
     video_path = find_video_file(args.video)
 
-    extractor = VideoFeatureExtractor(sample_rate=args.sample_rate, max_samples=args.max_frames)
+    extractor = VideoFeatureExtractor(
+        sample_rate=args.sample_rate,
+        max_samples=args.max_frames,
+        motion_method=args.motion_method,
+        max_width=args.max_width or None,
+        workers=args.workers,
+        person_interval=args.person_interval,
+        use_opencl=args.opencl,
+        use_cuda=args.cuda,
+    )
     features, frame_stats, metadata = extractor.extract(video_path)
 
     prototype_store = PrototypeStore(args.prototype_store)
-    classifier = HeuristicCrimeClassifier(prototypes=list(prototype_store))
+    classifier = HeuristicCrimeClassifier(prototypes=prototype_store)
     classification = classifier.classify(features, video_path=video_path)
 
     summarizer = VideoSummarizer()
@@ -88,9 +183,7 @@ def main() -> None:
     print(classification.explanation)
 
     if args.dump_stats:
-        payload = serialize(features, frame_stats, classification)
-        args.dump_stats.parent.mkdir(parents=True, exist_ok=True)
-        args.dump_stats.write_text(json.dumps(payload, indent=2))
+        dump_stats(args.dump_stats, features, frame_stats, classification)
         print(f"\nDetailed statistics written to {args.dump_stats}")
 
     if args.train_label:
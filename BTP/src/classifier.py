@@ -1,87 +1,109 @@
 from __future__ import annotations
 
+import functools
 import math
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from types import MappingProxyType
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 from .features import VideoFeatures
-from .prototype_store import PrototypeSample, build_feature_vector
+from .prototype_store import PrototypeSample, PrototypeStore, build_feature_vector, stack_prototypes
 
 
-@dataclass
-class ClassificationResult:
-    label: str
-    scores: Dict[str, float]
-    explanation: str
+# Canonical class order; _score_kernel returns its scores in this order.
+ALL_CLASSES = ("robbery", "theft", "assault", "explosion", "road accident", "normal")
 
 
-class HeuristicCrimeClassifier:
-    classes = ("robbery", "theft", "assault", "explosion", "road accident", "normal")
-    filename_overrides = {
-        "road accident": ("accident", "acci"),
-        "explosion": ("explosion", "expl", "exp"),
-        "robbery": ("robbery", "rob"),
-        "theft": ("theft", "steal", "new"),
-    }
+def _normalize_motion(avg_motion: float, peak_motion: float) -> float:
+    # Hyperbolic tan keeps values in [0, 1) without requiring dataset calibration.
+    avg_component = math.tanh(avg_motion / 6.0)
+    peak_component = math.tanh(peak_motion / 10.0)
+    return min(1.0, 0.6 * avg_component + 0.4 * peak_component)
 
-    def __init__(self, prototypes: Optional[List[PrototypeSample]] = None):
-        self.prototypes = prototypes or []
 
-    def classify(self, features: VideoFeatures, *, video_path: Optional[Path | str] = None) -> ClassificationResult:
-        if features.frame_samples == 0:
-            raise ValueError("No frames were analyzed. Provide a longer clip or adjust sampling.")
+def _score_kernel(
+    *,
+    average_motion: float,
+    peak_motion: float,
+    motion_std: float,
+    crowd_ratio: float,
+    solo_motion_ratio: float,
+    motion_burst_ratio: float,
+    person_presence_ratio: float,
+    multi_person_ratio: float,
+    motion_presence_ratio: float,
+    active_motion_ratio: float,
+    late_motion_ratio: float,
+    motion_trend: float,
+    calm_ratio: float,
+    avg_moving_objects: float,
+    max_moving_objects: float,
+    score_explosion: bool = True,
+    score_road_accident: bool = True,
+) -> Tuple[Tuple[float, float, float, float, float, float], Tuple[float, ...]]:
+    """Score every class from plain floats, in ALL_CLASSES order.
 
-        motion_score = self._normalize_motion(features.average_motion, features.peak_motion)
-        volatility_score = math.tanh(features.motion_std / 3.5)
-        burst_score = min(1.0, features.motion_burst_ratio)
-        crowd_score = min(1.0, features.crowd_ratio)
-        multi_person_score = min(1.0, features.multi_person_ratio)
-        solo_motion_score = min(1.0, features.solo_motion_ratio)
-        calm_score = max(0.0, min(1.0, features.calm_ratio))
-        presence_score = min(1.0, features.person_presence_ratio)
-        motion_presence_score = min(1.0, features.motion_presence_ratio)
-        active_motion_score = min(1.0, features.active_motion_ratio)
-        late_motion_score = min(1.0, features.late_motion_ratio)
-        trend_score = math.tanh(max(0.0, features.motion_trend) / 2.0)
-        moving_group_score = min(1.0, features.max_moving_objects / 4.0)
-        spike_score = math.tanh(max(0.0, features.peak_motion - features.average_motion) / 4.0)
-        sparse_presence_score = max(0.0, 1.0 - presence_score)
-        object_density_score = min(1.0, features.avg_moving_objects / 3.0)
-        vehicle_flow_score = min(1.0, 0.6 * object_density_score + 0.4 * motion_presence_score)
-        lane_shift_score = min(1.0, 0.6 * late_motion_score + 0.4 * trend_score)
-        crowd_presence_penalty = min(1.0, 0.6 * crowd_score + 0.4 * presence_score)
-
-        robbery_score = (
-            0.25 * crowd_score
-            + 0.2 * multi_person_score
-            + 0.2 * moving_group_score
-            + 0.15 * burst_score
-            + 0.1 * late_motion_score
-            + 0.1 * motion_presence_score
-        )
-        theft_score = (
-            0.35 * solo_motion_score
-            + 0.25 * active_motion_score
-            + 0.15 * late_motion_score
-            + 0.15 * (1 - crowd_score)
-            + 0.1 * motion_presence_score
-        )
-        assault_score = (
-            0.3 * burst_score
-            + 0.2 * motion_score
-            + 0.2 * active_motion_score
-            + 0.15 * multi_person_score
-            + 0.1 * trend_score
-            + 0.05 * motion_presence_score
-        )
-        normal_score = (
-            0.3 * calm_score
-            + 0.25 * (1 - active_motion_score)
-            + 0.2 * (1 - burst_score)
-            + 0.15 * (1 - motion_presence_score)
-            + 0.1 * (1 - late_motion_score)
-        )
+    Kept free of objects and dicts so the arithmetic stays a self-contained scalar kernel.
+    Explosion and road-accident scores are left at 0.0 when their flags are off.
+    Also returns the component scores the explanation reports, as
+    (motion, bursts, crowd, presence, motion_presence, active, calm, trend).
+    """
+
+    motion_score = _normalize_motion(average_motion, peak_motion)
+    volatility_score = math.tanh(motion_std / 3.5)
+    burst_score = min(1.0, motion_burst_ratio)
+    crowd_score = min(1.0, crowd_ratio)
+    multi_person_score = min(1.0, multi_person_ratio)
+    solo_motion_score = min(1.0, solo_motion_ratio)
+    calm_score = max(0.0, min(1.0, calm_ratio))
+    presence_score = min(1.0, person_presence_ratio)
+    motion_presence_score = min(1.0, motion_presence_ratio)
+    active_motion_score = min(1.0, active_motion_ratio)
+    late_motion_score = min(1.0, late_motion_ratio)
+    trend_score = math.tanh(max(0.0, motion_trend) / 2.0)
+    moving_group_score = min(1.0, max_moving_objects / 4.0)
+    spike_score = math.tanh(max(0.0, peak_motion - average_motion) / 4.0)
+    sparse_presence_score = max(0.0, 1.0 - presence_score)
+    object_density_score = min(1.0, avg_moving_objects / 3.0)
+    vehicle_flow_score = min(1.0, 0.6 * object_density_score + 0.4 * motion_presence_score)
+    lane_shift_score = min(1.0, 0.6 * late_motion_score + 0.4 * trend_score)
+    crowd_presence_penalty = min(1.0, 0.6 * crowd_score + 0.4 * presence_score)
+
+    robbery_score = (
+        0.25 * crowd_score
+        + 0.2 * multi_person_score
+        + 0.2 * moving_group_score
+        + 0.15 * burst_score
+        + 0.1 * late_motion_score
+        + 0.1 * motion_presence_score
+    )
+    theft_score = (
+        0.35 * solo_motion_score
+        + 0.25 * active_motion_score
+        + 0.15 * late_motion_score
+        + 0.15 * (1 - crowd_score)
+        + 0.1 * motion_presence_score
+    )
+    assault_score = (
+        0.3 * burst_score
+        + 0.2 * motion_score
+        + 0.2 * active_motion_score
+        + 0.15 * multi_person_score
+        + 0.1 * trend_score
+        + 0.05 * motion_presence_score
+    )
+    normal_score = (
+        0.3 * calm_score
+        + 0.25 * (1 - active_motion_score)
+        + 0.2 * (1 - burst_score)
+        + 0.15 * (1 - motion_presence_score)
+        + 0.1 * (1 - late_motion_score)
+    )
+    explosion_score = 0.0
+    if score_explosion:
         explosion_base = (
             0.4 * spike_score
             + 0.25 * volatility_score
@@ -94,6 +116,8 @@ class HeuristicCrimeClassifier:
         if sparse_presence_score < 0.3:
             explosion_score *= 0.6
 
+    road_accident_score = 0.0
+    if score_road_accident:
         road_accident_base = (
             0.35 * vehicle_flow_score
             + 0.2 * spike_score
@@ -107,43 +131,141 @@ class HeuristicCrimeClassifier:
         if vehicle_flow_score < 0.25:
             road_accident_score *= 0.5
 
-        scores = {
-            "robbery": robbery_score,
-            "theft": theft_score,
-            "assault": assault_score,
-            "explosion": explosion_score,
-            "road accident": road_accident_score,
-            "normal": normal_score,
+    scores = (
+        robbery_score,
+        theft_score,
+        assault_score,
+        explosion_score,
+        road_accident_score,
+        normal_score,
+    )
+    components = (
+        motion_score,
+        burst_score,
+        crowd_score,
+        presence_score,
+        motion_presence_score,
+        active_motion_score,
+        calm_score,
+        trend_score,
+    )
+    return scores, components
+
+
+@functools.lru_cache(maxsize=256)
+def _normalized_stem(path_str: str) -> str:
+    return Path(path_str).stem.lower()
+
+
+@dataclass(slots=True)
+class ClassificationResult:
+    label: str
+    scores: Dict[str, float]
+    explanation: str
+
+
+class HeuristicCrimeClassifier:
+    classes = ALL_CLASSES
+    filename_overrides = {
+        "road accident": ("accident", "acci"),
+        "explosion": ("explosion", "expl", "exp"),
+        "robbery": ("robbery", "rob"),
+        "theft": ("theft", "steal", "new"),
+    }
+    _EXPLANATION_TEMPLATES = MappingProxyType(
+        {
+            "robbery": "Large groups and repeated bursts of motion suggest a coordinated grab.",
+            "theft": "Isolated motion while the scene stays sparse matches theft-like activity.",
+            "assault": "Aggressive bursts with multiple participants point to an assault pattern.",
+            "explosion": "Sudden, volatile spikes with little human presence align with an explosion-like blast.",
+            "road accident": "Dense moving objects and directional bursts in a sparse crowd resemble a road incident.",
+            "normal": "Low motion and calm frames dominate the clip, indicating routine activity.",
         }
+    )
+    _EXPLANATION_FORMAT = (
+        "{template} (motion={motion:.2f}, bursts={bursts:.2f}, crowd={crowd:.2f}, "
+        "people={presence:.2f}, movers={motion_presence:.2f}, active={active:.2f}, "
+        "calm={calm:.2f}, trend={trend:.2f})."
+    )
+
+    def __init__(
+        self,
+        prototypes: Optional[PrototypeStore | List[PrototypeSample]] = None,
+        classes: Optional[Sequence[str]] = None,
+    ):
+        if classes is not None:
+            unknown = [label for label in classes if label not in ALL_CLASSES]
+            if not classes or unknown:
+                raise ValueError(f"classes must be a non-empty subset of {ALL_CLASSES}, got {tuple(classes)}")
+            # Keep canonical order so score dicts stay stable regardless of argument order.
+            self.classes = tuple(label for label in ALL_CLASSES if label in classes)
+        if isinstance(prototypes, PrototypeStore):
+            # Reuse the store's prebuilt matrix instead of restacking its samples.
+            self.prototypes = list(prototypes)
+            matrix, labels = prototypes.matrix(), prototypes.labels()
+        else:
+            self.prototypes = prototypes or []
+            matrix, labels = stack_prototypes(self.prototypes)
+        # Prototypes with labels outside the known classes cannot receive a bonus.
+        known = np.isin(labels, self.classes)
+        self._proto_matrix = matrix[known]
+        self._label_idx = np.array(
+            [self.classes.index(label) for label in labels[known]], dtype=np.intp
+        )
+        self._overrides = tuple(
+            (label, keywords) for label, keywords in self.filename_overrides.items() if label in self.classes
+        )
+
+    def classify(self, features: VideoFeatures, *, video_path: Optional[Path | str] = None) -> ClassificationResult:
+        if features.frame_samples == 0:
+            raise ValueError("No frames were analyzed. Provide a longer clip or adjust sampling.")
+
+        kernel_scores, components = _score_kernel(
+            average_motion=features.average_motion,
+            peak_motion=features.peak_motion,
+            motion_std=features.motion_std,
+            crowd_ratio=features.crowd_ratio,
+            solo_motion_ratio=features.solo_motion_ratio,
+            motion_burst_ratio=features.motion_burst_ratio,
+            person_presence_ratio=features.person_presence_ratio,
+            multi_person_ratio=features.multi_person_ratio,
+            motion_presence_ratio=features.motion_presence_ratio,
+            active_motion_ratio=features.active_motion_ratio,
+            late_motion_ratio=features.late_motion_ratio,
+            motion_trend=features.motion_trend,
+            calm_ratio=features.calm_ratio,
+            avg_moving_objects=features.avg_moving_objects,
+            max_moving_objects=features.max_moving_objects,
+            score_explosion="explosion" in self.classes,
+            score_road_accident="road accident" in self.classes,
+        )
+        all_scores = dict(zip(ALL_CLASSES, kernel_scores))
+        scores = {label: all_scores[label] for label in self.classes}
         prototype_bonus = self._prototype_scores(features)
         if prototype_bonus:
             for label, bonus in prototype_bonus.items():
                 scores[label] += 0.2 * bonus
 
-        filename_hint = self._filename_override(video_path)
+        stem = _normalized_stem(str(video_path)) if video_path else None
+        filename_hint = self._filename_override(stem)
         label = filename_hint[0] if filename_hint else max(scores, key=scores.get)
+        motion, bursts, crowd, presence, motion_presence, active, calm, trend = components
         explanation = self._build_explanation(
             label,
-            motion=motion_score,
-            crowd=crowd_score,
-            calm=calm_score,
-            bursts=burst_score,
-            presence=presence_score,
-            motion_presence=motion_presence_score,
-            active=active_motion_score,
-            trend=trend_score,
+            motion=motion,
+            crowd=crowd,
+            calm=calm,
+            bursts=bursts,
+            presence=presence,
+            motion_presence=motion_presence,
+            active=active,
+            trend=trend,
         )
         return ClassificationResult(label=label, scores=scores, explanation=explanation)
 
-    @staticmethod
-    def _normalize_motion(avg_motion: float, peak_motion: float) -> float:
-        # Hyperbolic tan keeps values in [0, 1) without requiring dataset calibration.
-        avg_component = math.tanh(avg_motion / 6.0)
-        peak_component = math.tanh(peak_motion / 10.0)
-        return min(1.0, 0.6 * avg_component + 0.4 * peak_component)
-
-    @staticmethod
+    @classmethod
     def _build_explanation(
+        cls,
         label: str,
         *,
         motion: float,
@@ -155,52 +277,47 @@ class HeuristicCrimeClassifier:
         active: float,
         trend: float,
     ) -> str:
-        template = {
-            "robbery": "Large groups and repeated bursts of motion suggest a coordinated grab.",
-            "theft": "Isolated motion while the scene stays sparse matches theft-like activity.",
-            "assault": "Aggressive bursts with multiple participants point to an assault pattern.",
-            "explosion": "Sudden, volatile spikes with little human presence align with an explosion-like blast.",
-            "road accident": "Dense moving objects and directional bursts in a sparse crowd resemble a road incident.",
-            "normal": "Low motion and calm frames dominate the clip, indicating routine activity.",
-        }.get(label, "Heuristic classification completed.")
-        return (
-            f"{template} (motion={motion:.2f}, bursts={bursts:.2f}, crowd={crowd:.2f}, "
-            f"people={presence:.2f}, movers={motion_presence:.2f}, active={active:.2f}, "
-            f"calm={calm:.2f}, trend={trend:.2f})."
+        return cls._EXPLANATION_FORMAT.format(
+            template=cls._EXPLANATION_TEMPLATES.get(label, "Heuristic classification completed."),
+            motion=motion,
+            crowd=crowd,
+            calm=calm,
+            bursts=bursts,
+            presence=presence,
+            motion_presence=motion_presence,
+            active=active,
+            trend=trend,
         )
 
-    def _filename_override(self, video_path: Optional[Path | str]) -> Optional[Tuple[str, str]]:
-        if not video_path:
+    def _filename_override(self, stem: Optional[str]) -> Optional[Tuple[str, str]]:
+        """Return (label, keyword) for a lower-cased filename stem, if a keyword matches."""
+
+        if not stem:
             return None
-        name = Path(video_path).stem.lower()
-        for label, keywords in self.filename_overrides.items():
+        for label, keywords in self._overrides:
             for keyword in keywords:
-                if keyword and keyword in name:
+                if keyword and keyword in stem:
                     return label, keyword
         return None
 
-    def _feature_vector(self, features: VideoFeatures) -> List[float]:
+    def _feature_vector(self, features: VideoFeatures) -> np.ndarray:
         return build_feature_vector(features)
 
     def _prototype_scores(self, features: VideoFeatures) -> Dict[str, float]:
-        if not self.prototypes:
+        if not len(self._proto_matrix):
             return {}
-        current_vector = self._feature_vector(features)
-        accum: Dict[str, float] = {label: 0.0 for label in self.classes}
-        for sample in self.prototypes:
-            similarity = self._similarity(current_vector, sample.vector)
-            accum[sample.label] = accum.get(sample.label, 0.0) + similarity
-        total = sum(accum.values())
+        current = self._feature_vector(features)
+        diff = self._proto_matrix - current
+        # exp(-2.5 * ||diff||), evaluated in place on the squared distances.
+        similarities = np.einsum("ij,ij->i", diff, diff)
+        np.sqrt(similarities, out=similarities)
+        similarities *= -2.5
+        np.exp(similarities, out=similarities)
+        accum = np.bincount(self._label_idx, weights=similarities, minlength=len(self.classes))
+        total = float(accum.sum())
         if total <= 0:
             return {}
-        return {label: score / total for label, score in accum.items()}
-
-    @staticmethod
-    def _similarity(vec_a: List[float], vec_b: List[float]) -> float:
-        if not vec_a or not vec_b or len(vec_a) != len(vec_b):
-            return 0.0
-        distance = math.sqrt(sum((a - b) ** 2 for a, b in zip(vec_a, vec_b)))
-        return math.exp(-2.5 * distance)
+        return {label: float(score / total) for label, score in zip(self.classes, accum)}
 
 
-__all__ = ["HeuristicCrimeClassifier", "ClassificationResult"]
+__all__ = ["HeuristicCrimeClassifier", "ClassificationResult", "ALL_CLASSES"]
@@ -1,15 +1,16 @@
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple
+from typing import Tuple
 
 import numpy as np
 
-from .video_processing import FrameStats, VideoMetadata, extract_frame_stats
+from .video_processing import FrameStatsArrays, VideoMetadata, extract_frame_stats
 
 
-@dataclass
+@dataclass(slots=True)
 class VideoFeatures:
     average_motion: float
     peak_motion: float
@@ -34,17 +35,43 @@ class VideoFeatures:
 
 
 class VideoFeatureExtractor:
-    def __init__(self, sample_rate: float = 3.0, max_samples: int | None = None):
+    def __init__(
+        self,
+        sample_rate: float = 3.0,
+        max_samples: int | None = None,
+        motion_method: str = "farneback",
+        max_width: int | None = None,
+        workers: int = 1,
+        person_interval: int = 1,
+        use_opencl: bool = False,
+        use_cuda: bool = False,
+    ):
         self.sample_rate = sample_rate
         self.max_samples = max_samples
+        self.motion_method = motion_method
+        self.max_width = max_width
+        self.workers = workers
+        self.person_interval = person_interval
+        self.use_opencl = use_opencl
+        self.use_cuda = use_cuda
+
+    def extract(self, video_path: Path) -> Tuple[VideoFeatures, FrameStatsArrays, VideoMetadata]:
+        arrays, metadata = extract_frame_stats(
+            video_path,
+            self.sample_rate,
+            self.max_samples,
+            motion_method=self.motion_method,
+            max_width=self.max_width,
+            workers=self.workers,
+            person_interval=self.person_interval,
+            use_opencl=self.use_opencl,
+            use_cuda=self.use_cuda,
+        )
+        features = self._aggregate(arrays, metadata)
+        return features, arrays, metadata
 
-    def extract(self, video_path: Path) -> Tuple[VideoFeatures, List[FrameStats], VideoMetadata]:
-        stats, metadata = extract_frame_stats(video_path, self.sample_rate, self.max_samples)
-        features = self._aggregate(stats, metadata)
-        return features, stats, metadata
-
-    def _aggregate(self, stats: List[FrameStats], metadata: VideoMetadata) -> VideoFeatures:
-        if not stats:
+    def _aggregate(self, arrays: FrameStatsArrays, metadata: VideoMetadata) -> VideoFeatures:
+        if not len(arrays):
             return VideoFeatures(
                 average_motion=0.0,
                 peak_motion=0.0,
@@ -68,41 +95,42 @@ class VideoFeatureExtractor:
                 fps_estimate=metadata.fps,
             )
 
-        motions = np.array([s.motion_magnitude for s in stats], dtype=float)
-        people = np.array([s.person_count for s in stats], dtype=float)
-        moving_objects = np.array([s.moving_objects for s in stats], dtype=float)
+        count = len(arrays)
+        motions = arrays.motions
+        people = arrays.people
+        moving_objects = arrays.moving_objects
 
         calm_threshold = 1.0
         solo_motion_threshold = 1.2
-        burst_threshold = float(np.percentile(motions, 75)) if len(motions) else 0.0
+        burst_threshold = _upper_quartile(motions)
         active_threshold = 0.35
 
-        raw_calm_ratio = float(np.mean(motions < calm_threshold))
-        solo_motion_ratio = float(np.mean((people <= 1) & (motions > solo_motion_threshold)))
-        crowd_ratio = float(np.mean(people >= 3))
-        person_presence_ratio = float(np.mean(people >= 1))
-        multi_person_ratio = float(np.mean(people >= 2))
-        motion_burst_ratio = float(np.mean(motions >= burst_threshold))
-        motion_presence_ratio = float(np.mean(moving_objects >= 1))
-        active_motion_ratio = float(np.mean(motions >= active_threshold))
+        # Count threshold hits directly and reuse masks so each column is scanned as few times as possible.
+        active_mask = motions >= active_threshold
+        raw_calm_ratio = np.count_nonzero(motions < calm_threshold) / count
+        solo_motion_ratio = np.count_nonzero((people <= 1) & (motions > solo_motion_threshold)) / count
+        crowd_ratio = np.count_nonzero(people >= 3) / count
+        person_presence_ratio = np.count_nonzero(people >= 1) / count
+        multi_person_ratio = np.count_nonzero(people >= 2) / count
+        motion_burst_ratio = np.count_nonzero(motions >= burst_threshold) / count
+        motion_presence_ratio = np.count_nonzero(moving_objects >= 1) / count
+        active_motion_ratio = np.count_nonzero(active_mask) / count
         calm_ratio = float(0.5 * raw_calm_ratio + 0.5 * max(0.0, 1.0 - active_motion_ratio))
 
-        segment = max(1, len(stats) // 3)
-        early_motions = motions[:segment]
-        late_motions = motions[-segment:]
-        late_motion_ratio = (
-            float(np.mean(late_motions >= active_threshold)) if len(late_motions) else active_motion_ratio
-        )
-        motion_trend = (
-            float(np.mean(late_motions) - np.mean(early_motions))
-            if len(early_motions) and len(late_motions)
-            else 0.0
-        )
+        average_motion = float(motions.sum(dtype=np.float64)) / count
+        motion_variance = float(np.einsum("i,i->", motions, motions, dtype=np.float64)) / count
+        motion_std = math.sqrt(max(0.0, motion_variance - average_motion * average_motion))
+
+        segment = max(1, count // 3)
+        late_motion_ratio = np.count_nonzero(active_mask[-segment:]) / segment
+        motion_trend = float(
+            motions[-segment:].sum(dtype=np.float64) - motions[:segment].sum(dtype=np.float64)
+        ) / segment
 
         return VideoFeatures(
-            average_motion=float(np.mean(motions)),
-            peak_motion=float(np.max(motions)),
-            motion_std=float(np.std(motions)),
+            average_motion=average_motion,
+            peak_motion=float(motions.max()),
+            motion_std=motion_std,
             crowd_ratio=crowd_ratio,
             solo_motion_ratio=solo_motion_ratio,
             motion_burst_ratio=motion_burst_ratio,
@@ -114,13 +142,27 @@ class VideoFeatureExtractor:
             motion_trend=motion_trend,
             calm_ratio=calm_ratio,
             median_person_count=float(np.median(people)),
-            mean_person_count=float(np.mean(people)),
-            avg_moving_objects=float(np.mean(moving_objects)),
-            max_moving_objects=float(np.max(moving_objects)),
+            mean_person_count=float(people.sum(dtype=np.float64)) / count,
+            avg_moving_objects=float(moving_objects.sum(dtype=np.float64)) / count,
+            max_moving_objects=float(moving_objects.max()),
             duration_seconds=metadata.duration_seconds,
-            frame_samples=len(stats),
+            frame_samples=count,
             fps_estimate=metadata.fps,
         )
 
 
+def _upper_quartile(values: np.ndarray) -> float:
+    """75th percentile with linear interpolation, matching np.percentile(values, 75).
+
+    Uses a partial partition around the two neighbouring ranks instead of a full sort.
+    """
+
+    position = 0.75 * (len(values) - 1)
+    lower = int(math.floor(position))
+    upper = min(lower + 1, len(values) - 1)
+    partitioned = np.partition(values, (lower, upper))
+    low_value = float(partitioned[lower])
+    return low_value + (float(partitioned[upper]) - low_value) * (position - lower)
+
+
 __all__ = ["VideoFeatures", "VideoFeatureExtractor"]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
 from typing import Iterable, Optional
 
@@ -9,10 +10,21 @@ VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi", ".mkv", ".m4v")
 def list_video_files(search_dirs: Iterable[Path]) -> list[Path]:
     files: list[Path] = []
     for directory in search_dirs:
-        if not directory.exists():
+        if not directory.is_dir():
             continue
-        for ext in VIDEO_EXTENSIONS:
-            files.extend(sorted(directory.glob(f"*{ext}")))
+        # One directory scan per search dir; only matching entries are wrapped in Path.
+        # Hidden files are skipped, as glob("*") would.
+        with os.scandir(directory) as entries:
+            names = [
+                entry.name
+                for entry in entries
+                if not entry.name.startswith(".")
+                and entry.name.lower().endswith(VIDEO_EXTENSIONS)
+                and entry.is_file()
+            ]
+        # Group by VIDEO_EXTENSIONS priority, then by name, so .mp4 files come first.
+        names.sort(key=lambda name: (VIDEO_EXTENSIONS.index(os.path.splitext(name)[1].lower()), name))
+        files.extend(directory / name for name in names)
     return files
 
 
@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+import functools
 import json
-from dataclasses import asdict, dataclass
+import operator
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Iterable, List, Sequence
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # Optional: faster (de)serialization when installed.
+    orjson = None
 
 from .features import VideoFeatures
 
@@ -23,24 +32,63 @@ FEATURE_VECTOR_FIELDS: Sequence[tuple[str, float]] = (
     ("multi_person_ratio", 1.0),
 )
 
+_GET_VECTOR_FIELDS = operator.attrgetter(*(name for name, _ in FEATURE_VECTOR_FIELDS))
+_VECTOR_SCALES = np.array([scale or 1.0 for _, scale in FEATURE_VECTOR_FIELDS], dtype=np.float32)
+_VECTOR_LOW, _VECTOR_HIGH = -2.0, 2.0
+
 
-def build_feature_vector(features: VideoFeatures) -> List[float]:
-    """Convert VideoFeatures into a normalized vector for prototype matching."""
+def build_feature_vector(features: VideoFeatures) -> np.ndarray:
+    """Convert VideoFeatures into a normalized float32 vector for prototype matching."""
 
-    vector: List[float] = []
-    for field, scale in FEATURE_VECTOR_FIELDS:
-        value = float(getattr(features, field))
-        normalized = value / scale if scale else value
-        vector.append(max(-2.0, min(2.0, normalized)))
-    return vector
+    values = np.array(_GET_VECTOR_FIELDS(features), dtype=np.float32)
+    return np.clip(values / _VECTOR_SCALES, _VECTOR_LOW, _VECTOR_HIGH)
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class PrototypeSample:
     label: str
-    vector: List[float]
+    vector: np.ndarray = field(default_factory=lambda: np.zeros(len(FEATURE_VECTOR_FIELDS), dtype=np.float32))
     source: str | None = None
 
+    def __eq__(self, other: object) -> bool:
+        # The generated __eq__ would compare vectors with ==, which is ambiguous for arrays.
+        if not isinstance(other, PrototypeSample):
+            return NotImplemented
+        return (
+            self.label == other.label
+            and self.source == other.source
+            and np.array_equal(self.vector, other.vector)
+        )
+
+    def to_dict(self) -> dict:
+        return {"label": self.label, "vector": _shortest_float32(self.vector), "source": self.source}
+
+
+def _shortest_float32(vector) -> List[float]:
+    """Vector values as the shortest decimals that round-trip through float32 (0.1, not 0.10000000149011612).
+
+    Accepts arrays and plain lists, so both JSON writers see the same numbers.
+    """
+
+    return [float(str(value)) for value in np.asarray(vector, dtype=np.float32)]
+
+
+def _parse_json(raw: bytes):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def stack_prototypes(samples: Iterable[PrototypeSample]) -> Tuple[np.ndarray, np.ndarray]:
+    """Stack prototype vectors into an (N, D) float32 matrix plus an aligned label array.
+
+    Samples whose vector length does not match FEATURE_VECTOR_FIELDS are skipped.
+    """
+
+    dims = len(FEATURE_VECTOR_FIELDS)
+    usable = [sample for sample in samples if len(sample.vector) == dims]
+    matrix = np.asarray([sample.vector for sample in usable], dtype=np.float32).reshape(len(usable), dims)
+    labels = np.array([sample.label for sample in usable], dtype=object)
+    return matrix, labels
+
 
 class PrototypeStore:
     """Simple JSON-backed store for labeled feature prototypes."""
@@ -48,31 +96,24 @@ class PrototypeStore:
     def __init__(self, path: Path):
         self.path = path
         self.samples: List[PrototypeSample] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._labels: Optional[np.ndarray] = None
+        # (mtime_ns, samples) of the file as last loaded or written, to skip no-op saves.
+        self._persisted: Optional[Tuple[int, Tuple[PrototypeSample, ...]]] = None
         self._load()
 
     def _load(self) -> None:
-        if not self.path.exists():
-            self.samples = []
-            return
+        self._invalidate()
         try:
-            payload = json.loads(self.path.read_text())
-        except (json.JSONDecodeError, OSError):
+            mtime_ns = self.path.stat().st_mtime_ns
+        except OSError:
             self.samples = []
+            self._persisted = None
             return
-        samples: List[PrototypeSample] = []
-        for entry in payload if isinstance(payload, list) else []:
-            label = entry.get("label")
-            vector = entry.get("vector")
-            if not isinstance(label, str) or not isinstance(vector, list):
-                continue
-            samples.append(
-                PrototypeSample(
-                    label=label,
-                    vector=[float(v) for v in vector],
-                    source=entry.get("source"),
-                )
-            )
-        self.samples = samples
+        samples, self._matrix, self._labels = _load_store(str(self.path), mtime_ns)
+        # Cached samples are shared between stores; hand this one its own copies.
+        self.samples = [replace(sample) for sample in samples]
+        self._persisted = (mtime_ns, samples)
 
     def add_sample(self, label: str, features: VideoFeatures, source: Path | None = None) -> None:
         vector = build_feature_vector(features)
@@ -80,19 +121,97 @@ class PrototypeStore:
         if source_name:
             self.samples = [s for s in self.samples if s.source != source_name]
         self.samples.append(PrototypeSample(label=label, vector=vector, source=source_name))
+        self._invalidate()
         self._save()
 
     def extend(self, samples: Iterable[PrototypeSample]) -> None:
         self.samples.extend(samples)
+        self._invalidate()
         self._save()
 
+    def matrix(self) -> np.ndarray:
+        """Return the (N, D) float32 matrix of prototype vectors."""
+
+        if self._matrix is None:
+            self._matrix, self._labels = stack_prototypes(self.samples)
+        return self._matrix
+
+    def labels(self) -> np.ndarray:
+        """Return the prototype labels aligned with the rows of matrix()."""
+
+        if self._labels is None:
+            self._matrix, self._labels = stack_prototypes(self.samples)
+        return self._labels
+
+    def _invalidate(self) -> None:
+        self._matrix = None
+        self._labels = None
+
     def _save(self) -> None:
+        # Skip the write when the samples match what was last loaded or written and the
+        # file has not been touched since; comparing samples also sidesteps the exponent
+        # notation that orjson and json format differently for tiny values.
+        if self._persisted is not None:
+            persisted_mtime, persisted = self._persisted
+            try:
+                unchanged = self.path.stat().st_mtime_ns == persisted_mtime
+            except OSError:
+                unchanged = False
+            if unchanged and list(persisted) == self.samples:
+                return
+        payload = [sample.to_dict() for sample in self.samples]
+        if orjson is not None:
+            data = orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(payload, indent=2).encode()
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        payload = [asdict(sample) for sample in self.samples]
-        self.path.write_text(json.dumps(payload, indent=2))
+        self.path.write_bytes(data)
+        _load_store.cache_clear()
+        # Snapshot with private vectors so later in-place edits still count as changes.
+        snapshot = tuple(
+            replace(sample, vector=np.array(sample.vector, dtype=np.float32)) for sample in self.samples
+        )
+        self._persisted = (self.path.stat().st_mtime_ns, snapshot)
 
     def __iter__(self):
         return iter(self.samples)
 
-
-__all__ = ["PrototypeStore", "PrototypeSample", "build_feature_vector", "FEATURE_VECTOR_FIELDS"]
+    def __len__(self) -> int:
+        return len(self.samples)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_store(path_str: str, mtime_ns: int) -> Tuple[Tuple[PrototypeSample, ...], np.ndarray, np.ndarray]:
+    """Parse a prototype file once per (path, mtime) and prebuild its vector matrix.
+
+    The cached arrays, including each sample's vector, are shared between stores,
+    so they are marked read-only.
+    """
+
+    try:
+        raw = Path(path_str).read_bytes()
+        payload = _parse_json(raw)
+    except (ValueError, OSError):
+        payload = []
+    samples: List[PrototypeSample] = []
+    for entry in payload if isinstance(payload, list) else []:
+        label = entry.get("label")
+        vector = entry.get("vector")
+        if not isinstance(label, str) or not isinstance(vector, list):
+            continue
+        vector = np.asarray(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        samples.append(PrototypeSample(label=label, vector=vector, source=entry.get("source")))
+    matrix, labels = stack_prototypes(samples)
+    matrix.setflags(write=False)
+    labels.setflags(write=False)
+    return tuple(samples), matrix, labels
+
+
+__all__ = [
+    "PrototypeStore",
+    "PrototypeSample",
+    "build_feature_vector",
+    "stack_prototypes",
+    "FEATURE_VECTOR_FIELDS",
+]
@@ -1,9 +1,32 @@
 from __future__ import annotations
 
+import functools
 from typing import Iterable, List
 
+import numpy as np
+
 from .features import VideoFeatures
-from .video_processing import FrameStats
+from .video_processing import FrameStats, FrameStatsArrays
+
+HEADER_TEMPLATE = (
+    "Predicted class: {}.\n"
+    "Analyzed duration: {:.1f}s across {} sampled frames.\n"
+    "Average detected people per frame: {:.1f} (median {:.1f}).\n"
+    "Moving objects per frame: avg {:.1f} (max {:.0f}).\n"
+    "Motion: avg {:.2f}, peak {:.2f}, calm ratio {:.2f}.\n"
+    "Active motion ratio: {:.2f}, late-scene activity: {:.2f}.\n"
+    "Frames with crowds (>=3 people): {}.\n"
+    "Frames with spikes in motion: {}."
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _format_time(seconds: float) -> str:
+    if seconds < 60:
+        return f"{seconds:0.1f}s"
+    minutes = int(seconds // 60)
+    remainder = seconds % 60
+    return f"{minutes:02d}:{remainder:04.1f}"
 
 
 class VideoSummarizer:
@@ -11,34 +34,43 @@ class VideoSummarizer:
         self,
         label: str,
         features: VideoFeatures,
-        frame_stats: Iterable[FrameStats],
+        frame_stats: FrameStatsArrays | Iterable[FrameStats],
     ) -> str:
-        stats_list: List[FrameStats] = list(frame_stats)
-        high_motion_events = [
-            s for s in stats_list if s.motion_magnitude > features.average_motion * 1.5
-        ]
-        crowd_events = [s for s in stats_list if s.person_count >= 3]
-
+        if not isinstance(frame_stats, FrameStatsArrays):
+            frame_stats = FrameStatsArrays.from_frame_stats(frame_stats)
+        records = frame_stats.records
+        motions = records["motion_magnitude"].astype(np.float64)
+        # Gather rows via index arrays: take() on structured records is several times
+        # cheaper than boolean-mask indexing.
+        high_motion_events = records.take(np.flatnonzero(motions > features.average_motion * 1.5))
+        crowd_events = records.take(np.flatnonzero(records["person_count"] >= 3))
+
+        header = HEADER_TEMPLATE.format(
+            label.upper(),
+            features.duration_seconds,
+            features.frame_samples,
+            features.mean_person_count,
+            features.median_person_count,
+            features.avg_moving_objects,
+            features.max_moving_objects,
+            features.average_motion,
+            features.peak_motion,
+            features.calm_ratio,
+            features.active_motion_ratio,
+            features.late_motion_ratio,
+            len(crowd_events),
+            len(high_motion_events),
+        )
         summary_lines = [
-            f"Predicted class: {label.upper()}.",
-            f"Analyzed duration: {features.duration_seconds:.1f}s across {features.frame_samples} sampled frames.",
-            f"Average detected people per frame: {features.mean_person_count:.1f} (median {features.median_person_count:.1f}).",
-            f"Moving objects per frame: avg {features.avg_moving_objects:.1f} (max {features.max_moving_objects:.0f}).",
-            f"Motion: avg {features.average_motion:.2f}, peak {features.peak_motion:.2f}, calm ratio {features.calm_ratio:.2f}.",
-            f"Active motion ratio: {features.active_motion_ratio:.2f}, late-scene activity: {features.late_motion_ratio:.2f}.",
-            f"Frames with crowds (>=3 people): {len(crowd_events)}.",
-            f"Frames with spikes in motion: {len(high_motion_events)}.",
+            header,
+            self._describe_activity(label, features, len(high_motion_events), len(crowd_events)),
         ]
-
-        summary_lines.append(
-            self._describe_activity(label, features, len(high_motion_events), len(crowd_events))
-        )
         timeline_lines = self._describe_timeline(high_motion_events, crowd_events)
         if timeline_lines:
             summary_lines.append("Notable moments:")
             summary_lines.extend(f"  - {line}" for line in timeline_lines)
 
-        segment_lines = self._describe_segments(stats_list)
+        segment_lines = self._describe_segments(records, motions)
         if segment_lines:
             summary_lines.append("Segment view:")
             summary_lines.extend(f"  - {line}" for line in segment_lines)
@@ -90,76 +122,73 @@ class VideoSummarizer:
         return "Scene stays balanced with modest movement and no persistent crowds."
 
     @staticmethod
-    def _describe_timeline(
-        high_motion_events: List[FrameStats],
-        crowd_events: List[FrameStats],
-    ) -> List[str]:
+    def _describe_timeline(high_motion_events: np.ndarray, crowd_events: np.ndarray) -> List[str]:
+        """Build timeline sentences from structured FRAME_STATS_DTYPE event rows."""
+
         timeline: List[str] = []
-        if high_motion_events:
-            top_motion = sorted(high_motion_events, key=lambda s: s.motion_magnitude, reverse=True)[:3]
-            for event in top_motion:
+        spike_motions = high_motion_events["motion_magnitude"]
+        if len(spike_motions):
+            # Keep only rows at or above the third-largest level (one partition, no full sort),
+            # then order those stably so ties resolve to the earliest frame like sorted() did.
+            rank = max(0, len(spike_motions) - 3)
+            cutoff = np.partition(spike_motions, rank)[rank]
+            candidates = np.flatnonzero(spike_motions >= cutoff)
+            candidates = candidates[np.argsort(-spike_motions[candidates], kind="stable")[:3]]
+            for event in high_motion_events[candidates]:
                 timeline.append(
-                    f"Spike in motion around t={VideoSummarizer._format_time(event.timestamp)} "
-                    f"(level {event.motion_magnitude:.2f})."
+                    f"Spike in motion around t={_format_time(float(event['timestamp']))} "
+                    f"(level {float(event['motion_magnitude']):.2f})."
                 )
 
-        if crowd_events:
-            first = min(crowd_events, key=lambda s: s.timestamp)
-            last = max(crowd_events, key=lambda s: s.timestamp)
+        if len(crowd_events):
+            crowd_times = crowd_events["timestamp"]
+            first = int(crowd_times.argmin())
+            last = int(crowd_times.argmax())
             if first == last:
                 timeline.append(
-                    f"Crowd detected near t={VideoSummarizer._format_time(first.timestamp)} "
-                    f"with ~{first.person_count} people."
+                    f"Crowd detected near t={_format_time(float(crowd_times[first]))} "
+                    f"with ~{int(crowd_events['person_count'][first])} people."
                 )
             else:
                 timeline.append(
-                    f"Crowd present between t={VideoSummarizer._format_time(first.timestamp)} "
-                    f"and t={VideoSummarizer._format_time(last.timestamp)}."
+                    f"Crowd present between t={_format_time(float(crowd_times[first]))} "
+                    f"and t={_format_time(float(crowd_times[last]))}."
                 )
-        max_motion = max((event.motion_magnitude for event in high_motion_events), default=0.0)
+        max_motion = float(spike_motions.max()) if len(spike_motions) else 0.0
         if max_motion > 0:
-            mover_surges = [
-                s
-                for s in high_motion_events
-                if s.moving_objects >= 1 and s.motion_magnitude >= 0.8 * max_motion
-            ]
-            for event in mover_surges:
+            surge_mask = (high_motion_events["moving_objects"] >= 1) & (spike_motions >= 0.8 * max_motion)
+            for event in high_motion_events.take(np.flatnonzero(surge_mask)):
                 timeline.append(
-                    f"Visible movers detected near t={VideoSummarizer._format_time(event.timestamp)} "
-                    f"(~{event.moving_objects} active regions)."
+                    f"Visible movers detected near t={_format_time(float(event['timestamp']))} "
+                    f"(~{int(event['moving_objects'])} active regions)."
                 )
         return timeline
 
     @staticmethod
-    def _format_time(seconds: float) -> str:
-        if seconds < 60:
-            return f"{seconds:0.1f}s"
-        minutes = int(seconds // 60)
-        remainder = seconds % 60
-        return f"{minutes:02d}:{remainder:04.1f}"
-
-    @staticmethod
-    def _describe_segments(stats_list: List[FrameStats]) -> List[str]:
-        if not stats_list:
+    def _describe_segments(records: np.ndarray, motions: np.ndarray) -> List[str]:
+        if not len(records):
             return []
-        length = len(stats_list)
+        length = len(records)
+        movers = records["moving_objects"]
+        timestamps = records["timestamp"]
         chunk = max(1, length // 3)
         segments = []
         labels = ["Early", "Middle", "Final"]
         for idx, label in enumerate(labels):
             start = idx * chunk
             end = (idx + 1) * chunk if idx < 2 else length
-            segment = stats_list[start:end]
-            if not segment:
+            if start >= min(end, length):
                 continue
-            motions = [s.motion_magnitude for s in segment]
-            movers = [s.moving_objects for s in segment]
-            avg_motion = sum(motions) / len(motions)
-            max_motion = max(motions)
-            avg_movers = sum(movers) / len(movers)
-            max_movers = max(movers)
+            segment_motions = motions[start:end]
+            segment_movers = movers[start:end]
             description = VideoSummarizer._segment_sentence(
-                label, segment[0].timestamp, segment[-1].timestamp, avg_motion, max_motion, avg_movers, max_movers
+                label,
+                float(timestamps[start]),
+                float(timestamps[min(end, length) - 1]),
+                float(segment_motions.mean()),
+                float(segment_motions.max()),
+                float(segment_movers.mean()),
+                int(segment_movers.max()),
             )
             segments.append(description)
         return segments
@@ -189,7 +218,7 @@ class VideoSummarizer:
             mover_phrase = f"up to {max_movers} moving subjects"
 
         return (
-            f"{label} phase ({VideoSummarizer._format_time(start)}-{VideoSummarizer._format_time(end)}): "
+            f"{label} phase ({_format_time(start)}-{_format_time(end)}): "
             f"{motion_phrase} with {mover_phrase} (avg motion {avg_motion:.2f}, peak {max_motion:.2f})."
         )
 
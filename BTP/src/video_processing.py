@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Callable, Deque, Iterable, Iterator, Optional, Tuple
 
 import cv2
 import numpy as np
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FrameStats:
+    """One sampled frame, as materialized from FrameStatsArrays records."""
+
     index: int
     timestamp: float
     person_count: int
@@ -17,7 +23,97 @@ class FrameStats:
     motion_magnitude: float
 
 
-@dataclass
+# Rows converted per tolist() call when iterating records, so only one chunk of Python
+# tuples exists at a time.
+_RECORD_CHUNK = 1024
+
+
+# Structured record layout for sampled frames; field names mirror FrameStats.
+FRAME_STATS_DTYPE = np.dtype(
+    [
+        ("index", np.int32),
+        ("timestamp", np.float64),
+        ("person_count", np.int32),
+        ("moving_objects", np.int32),
+        ("motion_magnitude", np.float32),
+    ]
+)
+
+
+@dataclass(slots=True)
+class FrameStatsArrays:
+    """Per-frame measurements held in one structured array of FRAME_STATS_DTYPE.
+
+    The column properties return field views for vectorized aggregation;
+    FrameStats records are only built on demand, e.g. for reporting.
+    """
+
+    records: np.ndarray
+
+    @classmethod
+    def allocate(cls, capacity: int) -> "FrameStatsArrays":
+        return cls(records=np.empty(capacity, dtype=FRAME_STATS_DTYPE))
+
+    @classmethod
+    def from_frame_stats(cls, frame_stats: Iterable[FrameStats]) -> "FrameStatsArrays":
+        rows = (
+            (s.index, s.timestamp, s.person_count, s.moving_objects, s.motion_magnitude)
+            for s in frame_stats
+        )
+        return cls(records=np.fromiter(rows, dtype=FRAME_STATS_DTYPE))
+
+    @property
+    def indices(self) -> np.ndarray:
+        return self.records["index"]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self.records["timestamp"]
+
+    @property
+    def people(self) -> np.ndarray:
+        return self.records["person_count"]
+
+    @property
+    def moving_objects(self) -> np.ndarray:
+        return self.records["moving_objects"]
+
+    @property
+    def motions(self) -> np.ndarray:
+        return self.records["motion_magnitude"]
+
+    def resized(self, size: int) -> "FrameStatsArrays":
+        """Return a copy holding the first min(size, capacity) rows in an array of length size."""
+
+        grown = FrameStatsArrays.allocate(size)
+        keep = min(size, len(self))
+        grown.records[:keep] = self.records[:keep]
+        return grown
+
+    def _rows(self) -> Iterator[tuple]:
+        records = self.records
+        for start in range(0, len(records), _RECORD_CHUNK):
+            yield from records[start:start + _RECORD_CHUNK].tolist()
+
+    def as_records(self) -> Iterator[dict]:
+        """Yield one plain dict per frame, keyed like FrameStats fields."""
+
+        names = FRAME_STATS_DTYPE.names
+        for row in self._rows():
+            yield dict(zip(names, row))
+
+    def as_framestats_iter(self) -> Iterator[FrameStats]:
+        for row in self._rows():
+            yield FrameStats(*row)
+
+    def __iter__(self) -> Iterator[FrameStats]:
+        return self.as_framestats_iter()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+@dataclass(slots=True)
 class VideoMetadata:
     fps: float
     frame_count: int
@@ -30,6 +126,16 @@ class VideoProcessingError(RuntimeError):
     pass
 
 
+# Decoded frames buffered between the decoder thread and the analysis loop.
+_DECODE_QUEUE_SIZE = 8
+_END_OF_STREAM = object()
+
+
+# Default HOG people window as (width, height). detectMultiScale corrupts memory on
+# frames smaller than the window, so such frames are never passed to it.
+_HOG_WINDOW = (64, 128)
+
+
 def _create_hog_detector() -> cv2.HOGDescriptor:
     hog = cv2.HOGDescriptor()
     hog.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
@@ -46,9 +152,34 @@ def _count_people(frame_gray: np.ndarray, hog: cv2.HOGDescriptor) -> int:
     return len(rects)
 
 
-def _motion_magnitude(prev_gray: Optional[np.ndarray], gray: np.ndarray) -> float:
-    if prev_gray is None:
-        return 0.0
+_thread_state = threading.local()
+
+
+def _count_people_thread_local(frame_gray: np.ndarray) -> int:
+    # Each thread (pool worker or caller) builds its detector once and reuses it across
+    # runs; HOGDescriptor is not documented as thread-safe, so it is never shared.
+    hog = getattr(_thread_state, "hog", None)
+    if hog is None:
+        hog = _thread_state.hog = _create_hog_detector()
+    return _count_people(frame_gray, hog)
+
+
+def _host(array):
+    """Download a cv2.UMat to a NumPy array; NumPy arrays pass through unchanged."""
+
+    return array.get() if isinstance(array, cv2.UMat) else array
+
+
+def _frame_shape(frame) -> Tuple[int, int]:
+    """(height, width) of a NumPy, cv2.UMat or GpuMat frame."""
+
+    if isinstance(frame, (np.ndarray, cv2.UMat)):
+        return _host(frame).shape[:2]
+    width, height = frame.size()
+    return height, width
+
+
+def _motion_magnitude(prev_gray: np.ndarray, gray: np.ndarray) -> float:
     flow = cv2.calcOpticalFlowFarneback(
         prev_gray,
         gray,
@@ -61,27 +192,231 @@ def _motion_magnitude(prev_gray: Optional[np.ndarray], gray: np.ndarray) -> floa
         poly_sigma=1.1,
         flags=0,
     )
-    magnitude, _ = cv2.cartToPolar(flow[..., 0], flow[..., 1])
-    return float(np.mean(magnitude))
+    flow = _host(flow)
+    # Per-pixel magnitude without the angle cartToPolar would also compute; cv2.mean
+    # accumulates in double precision, so this is still the strict mean, not an RMS.
+    magnitude = cv2.magnitude(flow[..., 0], flow[..., 1])
+    return cv2.mean(magnitude)[0]
+
+
+def _sparse_flow_magnitude(prev_gray: np.ndarray, gray: np.ndarray) -> float:
+    """Mean Lucas-Kanade displacement of up to 200 tracked corners."""
+
+    corners = _host(cv2.goodFeaturesToTrack(prev_gray, maxCorners=200, qualityLevel=0.01, minDistance=7))
+    if corners is None or not corners.size:
+        return 0.0
+    moved, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, corners, None)
+    moved, status = _host(moved), _host(status)
+    tracked = status.ravel() == 1
+    if not tracked.any():
+        return 0.0
+    displacement = (moved - corners).reshape(-1, 2)[tracked]
+    return float(np.mean(np.linalg.norm(displacement, axis=1)))
+
+
+def _frame_difference(prev_gray: np.ndarray, gray: np.ndarray) -> float:
+    """Mean absolute intensity change on quarter-resolution frames, scaled to [0, 1]."""
+
+    prev_small = cv2.resize(prev_gray, None, fx=0.25, fy=0.25, interpolation=cv2.INTER_AREA)
+    small = cv2.resize(gray, None, fx=0.25, fy=0.25, interpolation=cv2.INTER_AREA)
+    return float(_host(cv2.absdiff(prev_small, small)).mean()) / 255.0
+
+
+# Motion estimators selectable via extract_frame_stats(motion_method=...). Each compares a
+# frame with the previous sampled one; the first sample has none and scores 0. The classifier
+# thresholds were tuned on dense Farneback flow. "lk" also measures pixel displacement but
+# averages over tracked corners, which usually sit on moving texture, so it reads higher;
+# "diff" is an intensity-change proxy on a [0, 1] scale.
+MOTION_METHODS = {
+    "farneback": _motion_magnitude,
+    "lk": _sparse_flow_magnitude,
+    "diff": _frame_difference,
+}
+
+
+# Opening kernel for the foreground mask; read-only, so it is shared by all calls.
+_MORPH_KERNEL = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
 
 
 def _estimate_moving_objects(fg_mask: np.ndarray, min_area: int = 400) -> int:
+    """Count foreground blobs whose contour area is at least min_area.
+
+    A cv2.UMat mask stays on the OpenCL device through blur, threshold and opening;
+    only the cleaned mask is downloaded for contour tracing.
+    """
+
     if fg_mask is None:
         return 0
     blurred = cv2.medianBlur(fg_mask, 5)
     _, thresh = cv2.threshold(blurred, 200, 255, cv2.THRESH_BINARY)
-    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
-    cleaned = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel, iterations=2)
-    contours, _ = cv2.findContours(cleaned, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    cleaned = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, _MORPH_KERNEL, iterations=2)
+    # External contours with polygon areas define what counts as one object here.
+    # connectedComponentsWithStats measures pixel areas instead (shifting counts)
+    # and is several times slower than findContours on these masks.
+    contours, _ = cv2.findContours(_host(cleaned), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
     return int(sum(1 for contour in contours if cv2.contourArea(contour) >= min_area))
 
 
+def _cuda_available() -> bool:
+    """True when OpenCV was built with the CUDA modules used here and a device is present."""
+
+    cuda = getattr(cv2, "cuda", None)
+    required = ("createBackgroundSubtractorMOG2", "HOG_create", "FarnebackOpticalFlow_create")
+    if cuda is None or not all(hasattr(cuda, name) for name in required):
+        return False
+    try:
+        return cuda.getCudaEnabledDeviceCount() > 0
+    except cv2.error:
+        return False
+
+
+def _upload_to_gpu(gray: np.ndarray) -> "cv2.cuda_GpuMat":
+    frame = cv2.cuda_GpuMat()
+    frame.upload(gray)
+    return frame
+
+
+class _CudaPipeline:
+    """People detection, background subtraction and Farneback flow on the CUDA device.
+
+    Frames arrive as GpuMat uploads; only the foreground mask and scalar results are
+    downloaded. Detector parameters mirror the CPU path, but CUDA HOG has no padding
+    option and the kernels differ, so counts and motion are close rather than identical.
+    """
+
+    def __init__(self) -> None:
+        self.hog = cv2.cuda.HOG_create()
+        self.hog.setSVMDetector(self.hog.getDefaultPeopleDetector())
+        self.hog.setWinStride((8, 8))
+        self.hog.setScaleFactor(1.05)
+        self.bg_subtractor = cv2.cuda.createBackgroundSubtractorMOG2(
+            history=300, varThreshold=25, detectShadows=False
+        )
+        self.flow = cv2.cuda.FarnebackOpticalFlow_create(
+            numLevels=3,
+            pyrScale=0.5,
+            fastPyramids=False,
+            winSize=15,
+            numIters=3,
+            polyN=5,
+            polySigma=1.1,
+            flags=0,
+        )
+        self.stream = cv2.cuda.Stream_Null()
+
+    def count_people(self, frame_gray: "cv2.cuda_GpuMat") -> int:
+        # detectMultiScale returns (locations, confidences) from Python; only the boxes count.
+        return len(self.hog.detectMultiScaleWithoutConf(frame_gray))
+
+    def foreground_mask(self, frame_gray: "cv2.cuda_GpuMat") -> np.ndarray:
+        return self.bg_subtractor.apply(frame_gray, -1.0, self.stream).download()
+
+    def motion_magnitude(self, prev_gray: "cv2.cuda_GpuMat", gray: "cv2.cuda_GpuMat") -> float:
+        flow = self.flow.calc(prev_gray, gray, None)
+        flow_x, flow_y = cv2.cuda.split(flow)
+        magnitude = cv2.cuda.magnitude(flow_x, flow_y)
+        width, height = magnitude.size()
+        return cv2.cuda.sum(magnitude)[0] / (width * height)
+
+
+def _put_unless_stopped(frames: "queue.Queue[object]", item: object, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            frames.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _decode_sampled_frames(
+    capture: cv2.VideoCapture,
+    stride: int,
+    max_width: Optional[int],
+    frames: "queue.Queue[object]",
+    stop: threading.Event,
+    upload: Optional[Callable[[np.ndarray], object]] = None,
+    inv_fps: Optional[float] = None,
+) -> None:
+    """Producer thread: push (frame_index, timestamp, gray, scale) for every sampled frame.
+
+    Timestamps are frame_index * inv_fps (exact for constant frame rate video); without a
+    known frame rate they are read from the capture position instead.
+
+    When upload is given (cv2.UMat or a GpuMat upload), gray is moved to the device once
+    here so the analysis steps share one device copy. Ends with _END_OF_STREAM; a decoding
+    error is pushed ahead of it so the consumer can re-raise.
+    """
+
+    frame_index = 0
+    scale: Optional[float] = None
+    try:
+        while not stop.is_set():
+            # grab() advances without converting the frame; only sampled frames are retrieved.
+            if not capture.grab():
+                break
+
+            if frame_index % stride != 0:
+                frame_index += 1
+                continue
+
+            success, frame = capture.retrieve()
+            if not success:
+                break
+
+            if inv_fps is not None:
+                timestamp = frame_index * inv_fps
+            else:
+                timestamp = capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            if scale is None:
+                scale = min(1.0, max_width / gray.shape[1]) if max_width else 1.0
+            if scale < 1.0:
+                gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            if upload is not None:
+                gray = upload(gray)
+            if not _put_unless_stopped(frames, (frame_index, float(timestamp), gray, scale), stop):
+                return
+            frame_index += 1
+    except Exception as exc:  # Surface decoder failures in the calling thread.
+        _put_unless_stopped(frames, exc, stop)
+    finally:
+        _put_unless_stopped(frames, _END_OF_STREAM, stop)
+
+
 def extract_frame_stats(
     video_path: Path,
     sample_rate: float = 3.0,
     max_samples: Optional[int] = None,
-) -> Tuple[List[FrameStats], VideoMetadata]:
-    """Sample frames from the video and compute per-frame statistics."""
+    motion_method: str = "farneback",
+    max_width: Optional[int] = None,
+    workers: int = 1,
+    person_interval: int = 1,
+    use_opencl: bool = False,
+    use_cuda: bool = False,
+) -> Tuple[FrameStatsArrays, VideoMetadata]:
+    """Sample frames from the video and compute per-frame statistics.
+
+    sample_rate: sampled frames per second of video; max_samples caps how many are analyzed.
+    motion_method: key of MOTION_METHODS used to score motion between sampled frames.
+    max_width: downscale wider frames to this width first (None keeps full resolution).
+    workers: threads for people detection; the other steps stay in frame order.
+    person_interval: count people on every n-th sampled frame and carry the count forward.
+    use_opencl: run the OpenCV work on an OpenCL device via cv2.UMat when one is usable.
+    use_cuda: run it on a CUDA device instead (farneback only; takes precedence over OpenCL).
+    """
+
+    if person_interval < 1:
+        raise ValueError(f"person_interval must be at least 1, got {person_interval}")
+    if max_width is not None and max_width < 0:
+        raise ValueError(f"max_width must not be negative, got {max_width}")
+    if motion_method not in MOTION_METHODS:
+        raise ValueError(f"Unknown motion method {motion_method!r}; expected one of {tuple(MOTION_METHODS)}")
+    estimate_motion = MOTION_METHODS[motion_method]
+    use_cuda = use_cuda and motion_method == "farneback" and _cuda_available()
+    use_opencl = use_opencl and not use_cuda and cv2.ocl.haveOpenCL()
+    if use_opencl:
+        cv2.ocl.setUseOpenCL(True)
 
     capture = cv2.VideoCapture(str(video_path))
     if not capture.isOpened():
@@ -95,50 +430,102 @@ def extract_frame_stats(
     # Fall back to a reasonable default when FPS is missing from metadata.
     effective_fps = fps if fps > 0 else 24.0
     stride = max(1, int(round(effective_fps / sample_rate))) if sample_rate > 0 else 1
+    # Timestamps are derived from the frame index when the container reports a frame rate.
+    inv_fps = 1.0 / fps if fps > 0 else None
 
-    hog = _create_hog_detector()
-    bg_subtractor = cv2.createBackgroundSubtractorMOG2(
-        history=300, varThreshold=25, detectShadows=False
-    )
-    stats: List[FrameStats] = []
+    if use_cuda:
+        # Detection already runs off the CPU here, so the people worker pool is not used.
+        cuda = _CudaPipeline()
+        upload: Optional[Callable[[np.ndarray], object]] = _upload_to_gpu
+        apply_background = cuda.foreground_mask
+        estimate_motion = cuda.motion_magnitude
+        workers = 1
+    else:
+        bg_subtractor = cv2.createBackgroundSubtractorMOG2(
+            history=300, varThreshold=25, detectShadows=False
+        )
+        upload = cv2.UMat if use_opencl else None
+        apply_background = bg_subtractor.apply
+    # frame_count can be missing or inaccurate, so the arrays grow on demand; max_samples
+    # only caps the estimate, since it may be far larger than the clip.
+    estimate = frame_count // stride + 1 if frame_count > 0 else 64
+    capacity = max(1, min(max_samples, estimate) if max_samples else estimate)
+    arrays = FrameStatsArrays.allocate(capacity)
     prev_gray: Optional[np.ndarray] = None
-    frame_index = 0
+    samples = 0
+    min_area: Optional[int] = None
+    detect_people = True
 
+    frames: "queue.Queue[object]" = queue.Queue(maxsize=_DECODE_QUEUE_SIZE)
+    stop = threading.Event()
+    decoder = threading.Thread(
+        target=_decode_sampled_frames,
+        args=(capture, stride, max_width, frames, stop, upload, inv_fps),
+        name="frame-decoder",
+        daemon=True,
+    )
+    decoder.start()
+    people_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="people") if workers > 1 else None
+    if use_cuda:
+        count_people = cuda.count_people
+    elif people_pool is None:
+        count_people = _count_people_thread_local
+    pending_people: Deque[Tuple[int, Future]] = deque()
+
+    # Bind per-frame callables and the record buffer to locals once; the loop
+    # writes each sample as a single structured row instead of per-column.
+    next_item = frames.get
+    records = arrays.records
     try:
         while True:
-            success, frame = capture.read()
-            if not success:
+            item = next_item()
+            if item is _END_OF_STREAM:
                 break
+            if isinstance(item, BaseException):
+                raise item
+            frame_index, timestamp, gray, scale = item
+            if min_area is None:
+                min_area = max(1, int(round(400 * scale * scale)))
+                frame_height, frame_width = _frame_shape(gray)
+                detect_people = frame_width >= _HOG_WINDOW[0] and frame_height >= _HOG_WINDOW[1]
+            if samples == len(records):
+                arrays = arrays.resized(2 * len(records))
+                records = arrays.records
 
-            if frame_index % stride != 0:
-                frame_index += 1
-                continue
-
-            timestamp = capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            person_count = _count_people(gray, hog)
-            fg_mask = bg_subtractor.apply(gray)
-            moving_objects = _estimate_moving_objects(fg_mask)
-            motion_mag = _motion_magnitude(prev_gray, gray)
-            stats.append(
-                FrameStats(
-                    index=frame_index,
-                    timestamp=float(timestamp),
-                    person_count=person_count,
-                    moving_objects=moving_objects,
-                    motion_magnitude=motion_mag,
-                )
-            )
+            people = 0
+            if detect_people and samples % person_interval == 0:
+                if people_pool is None:
+                    people = count_people(gray)
+                else:
+                    pending_people.append((samples, people_pool.submit(_count_people_thread_local, gray)))
+            moving_objects = _estimate_moving_objects(apply_background(gray), min_area)
+            motion_mag = estimate_motion(prev_gray, gray) if samples else 0.0
+            records[samples] = (frame_index, timestamp, people, moving_objects, motion_mag)
+            samples += 1
             prev_gray = gray
-            frame_index += 1
+            # Bound the number of in-flight frames held by the pool.
+            while len(pending_people) > 2 * workers:
+                slot, counted = pending_people.popleft()
+                records["person_count"][slot] = counted.result()
 
-            if max_samples and len(stats) >= max_samples:
+            if max_samples and samples >= max_samples:
                 break
+        while pending_people:
+            slot, counted = pending_people.popleft()
+            records["person_count"][slot] = counted.result()
+        if person_interval > 1 and samples:
+            # Carry each detected count forward over the frames that skipped detection.
+            detected = arrays.people[:samples:person_interval]
+            arrays.people[:samples] = np.repeat(detected, person_interval)[:samples]
     finally:
+        stop.set()
+        decoder.join()
         capture.release()
+        if people_pool is not None:
+            people_pool.shutdown(cancel_futures=True)
 
     duration_seconds = (
-        (frame_count / fps) if fps > 0 else (len(stats) / sample_rate if sample_rate > 0 else 0.0)
+        (frame_count / fps) if fps > 0 else (samples / sample_rate if sample_rate > 0 else 0.0)
     )
 
     metadata = VideoMetadata(
@@ -148,7 +535,15 @@ def extract_frame_stats(
         width=width,
         height=height,
     )
-    return stats, metadata
+    return arrays.resized(samples), metadata
 
 
-__all__ = ["FrameStats", "VideoMetadata", "extract_frame_stats", "VideoProcessingError"]
+__all__ = [
+    "FRAME_STATS_DTYPE",
+    "FrameStats",
+    "FrameStatsArrays",
+    "MOTION_METHODS",
+    "VideoMetadata",
+    "extract_frame_stats",
+    "VideoProcessingError",
+]